@@ -3,6 +3,8 @@
 import numpy as np
 import pandas as pd
 import h5py
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from quantum_gnss_guard.simulator import Simulator
 from pathlib import Path
 
@@ -18,31 +20,21 @@ def generate_dataset(config: dict, n_samples: int = 10000, output_file: str = 'd
     sim = Simulator(config)
     results = sim.run(mc_runs=n_samples // 100)  # Adjust for passes
 
-    # Create features and labels
-    features = []
-    labels = []
-
-    for _, row in results.iterrows():
-        # Simplified feature extraction
-        feature = {
-            'n_pairs': row['n_pairs'],
-            'detection_score': row['detection_score']
-        }
-        features.append(feature)
-        labels.append(1 if row['attack_type'] != 'none' else 0)
-
-    features_df = pd.DataFrame(features)
+    # Create features and labels (simplified feature extraction)
+    features_df = results[['n_pairs', 'detection_score']].copy()
+    labels = (results['attack_type'].values != 'none').astype(np.int8)
     labels_df = pd.DataFrame({'label': labels})
 
     # Export to HDF5
     with h5py.File(output_file, 'w') as f:
-        f.create_dataset('features', data=features_df.values)
-        f.create_dataset('labels', data=labels_df.values)
+        f.create_dataset('features', data=features_df.values, dtype='<f4', compression='lzf')
+        f.create_dataset('labels', data=labels_df.values, compression='lzf')
         f.create_dataset('feature_names', data=np.array(features_df.columns, dtype='S'))
 
     # Also CSV
     combined = pd.concat([features_df, labels_df], axis=1)
-    combined.to_csv(output_file.replace('.h5', '.csv'), index=False)
+    table = pa.Table.from_pandas(combined, preserve_index=False)
+    pacsv.write_csv(table, output_file.replace('.h5', '.csv'))
 
     print(f"Dataset saved to {output_file}")
 
@@ -6,14 +6,17 @@ import pandas as pd
 from sklearn.metrics import roc_curve, auc
 
 
-def plot_roc_from_csv(csv_file: str, output_file: str = 'roc.png'):
-    """Generate ROC plot from CSV results.
+def plot_roc_from_results(results_file: str, output_file: str = 'roc.png'):
+    """Generate ROC plot from exported results.
 
     Args:
-        csv_file: Path to results CSV
+        results_file: Path to results Parquet (or CSV)
         output_file: Output plot file
     """
-    df = pd.read_csv(csv_file)
+    if results_file.endswith('.csv'):
+        df = pd.read_csv(results_file)
+    else:
+        df = pd.read_parquet(results_file, columns=['attack_type', 'detection_score'])
 
     # Assume 'detection_score' and 'attack_type' columns
     y_true = (df['attack_type'] != 'none').astype(int)
@@ -36,4 +39,4 @@ def plot_roc_from_csv(csv_file: str, output_file: str = 'roc.png'):
 
 
 if __name__ == '__main__':
-    plot_roc_from_csv('results/simulation_results.csv')
\ No newline at end of file
+    plot_roc_from_results('results/simulation_results.parquet')
\ No newline at end of file
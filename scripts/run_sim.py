@@ -14,7 +14,8 @@ from pathlib import Path
 @click.option('--output', 'output_dir', default='results', help='Output directory')
 @click.option('--enable_qtt', is_flag=True, help='Enable Quantum Time Transfer')
 @click.option('--sync_rate', type=float, default=1000, help='QTT sync rate (Hz)')
-def main(tle_file, station_coords, pair_rate, attack_type, mc_runs, output_dir, enable_qtt, sync_rate):
+@click.option('--csv', 'write_csv', is_flag=True, help='Also write results as CSV')
+def main(tle_file, station_coords, pair_rate, attack_type, mc_runs, output_dir, enable_qtt, sync_rate, write_csv):
     """Run GNSS spoofing detection simulation."""
     config = {
         'tle_file': tle_file,
@@ -31,7 +32,7 @@ def main(tle_file, station_coords, pair_rate, attack_type, mc_runs, output_dir,
 
     # Create output dir
     Path(output_dir).mkdir(exist_ok=True)
-    sim.export_results(results, output_dir)
+    sim.export_results(results, output_dir, write_csv=write_csv)
 
     # Print summary
     print(f"Simulation complete. Results saved to {output_dir}")
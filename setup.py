@@ -8,10 +8,13 @@ setup(
     install_requires=[
         "numpy>=1.24.0",
         "scipy>=1.11.0",
+        "numba>=0.58.0",
         "pandas>=2.0.0",
+        "pyarrow>=14.0.0",
         "skyfield>=1.48",
         "qutip>=4.7.0",
         "scikit-learn>=1.3.0",
+        "joblib>=1.3.0",
         "tensorflow>=2.14.0",
         "matplotlib>=3.7.0",
         "plotly>=5.15.0",
@@ -2,28 +2,53 @@
 
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from scipy.special import expit
 from sklearn.metrics import roc_curve, auc
 from tensorflow import keras
 from tensorflow.keras import layers
 import tensorflow as tf
-from typing import Tuple, Dict
-from .utils import hellinger_distance, coincidence_histogram
+from typing import Tuple, Dict, List
+from .utils import coincidence_histogram, hellinger_from_dt
+
+# Reference histograms kept per detector, least recently used evicted first
+_REF_CACHE_SIZE = 16
+
+
+class Sampling(layers.Layer):
+    """Reparameterization layer z = mean + exp(log_var / 2) * eps, adding the KL loss."""
+
+    def call(self, inputs):
+        z_mean, z_log_var = inputs
+        kl_loss = -0.5 * tf.reduce_mean(z_log_var - tf.square(z_mean) - tf.exp(z_log_var) + 1)
+        self.add_loss(kl_loss)
+        epsilon = tf.random.normal(shape=tf.shape(z_mean))
+        return z_mean + tf.exp(0.5 * z_log_var) * epsilon
 
 
 class Detector:
     """Hybrid detector for spoofing detection."""
 
-    def __init__(self, vae_latent_dim: int = 16, coincidence_bins: int = 100):
+    def __init__(self, vae_latent_dim: int = 16, coincidence_bins: int = 100,
+                 batch_size: int = 64, window_ns: Tuple[float, float] = (-5, 5)):
         """Initialize detector.
 
         Args:
             vae_latent_dim: Latent dimension for VAE
             coincidence_bins: Bins for histogram
+            batch_size: Histograms per VAE forward pass
+            window_ns: Range of the classical Hellinger histograms (ns)
         """
         self.latent_dim = vae_latent_dim
         self.bins = coincidence_bins
+        self.batch_size = batch_size
+        self.window = (window_ns[0] * 1e-9, window_ns[1] * 1e-9)  # s
+        self.bin_width = (self.window[1] - self.window[0]) / coincidence_bins
         self.vae = None
         self.threshold = 0.1  # Hellinger threshold
+        self._legit_dt = None
+        self._legit_range = None
+        self._ref_hists = OrderedDict()
 
     def build_vae(self, input_shape: int):
         """Build VAE model.
@@ -40,12 +65,7 @@ class Detector:
         z_log_var = layers.Dense(self.latent_dim)(x)
 
         # Sampling layer
-        def sampling(args):
-            z_mean, z_log_var = args
-            epsilon = tf.random.normal(shape=tf.shape(z_mean))
-            return z_mean + tf.exp(0.5 * z_log_var) * epsilon
-
-        z = layers.Lambda(sampling)([z_mean, z_log_var])
+        z = Sampling()([z_mean, z_log_var])
 
         # Decoder
         decoder_inputs = keras.Input(shape=(self.latent_dim,))
@@ -63,12 +83,8 @@ class Detector:
         vae_outputs = decoder(encoder(encoder_inputs)[2])
         self.vae = keras.Model(encoder_inputs, vae_outputs, name='vae')
 
-        # Loss
-        reconstruction_loss = keras.losses.mse(encoder_inputs, vae_outputs)
-        kl_loss = -0.5 * tf.reduce_mean(z_log_var - tf.square(z_mean) - tf.exp(z_log_var) + 1)
-        self.vae.add_loss(kl_loss + reconstruction_loss)
-
-        self.vae.compile(optimizer='adam')
+        # Loss: reconstruction here, KL added by the Sampling layer
+        self.vae.compile(optimizer='adam', loss='mse', jit_compile=True)
 
     def train_vae(self, legit_histograms: np.ndarray, epochs: int = 50):
         """Train VAE on legitimate data.
@@ -79,43 +95,116 @@ class Detector:
         """
         if self.vae is None:
             self.build_vae(legit_histograms.shape[1])
-        self.vae.fit(legit_histograms, epochs=epochs, verbose=0)
 
-    def classical_detect(self, dt_true: np.ndarray, dt_spoof: np.ndarray) -> float:
-        """Classical detection using Hellinger distance.
+        # float32 halves host-to-device traffic; prefetch overlaps it with training
+        x = tf.convert_to_tensor(legit_histograms.astype(np.float32))
+        ds = (tf.data.Dataset.from_tensor_slices((x, x))
+              .shuffle(1024)
+              .batch(256)
+              .prefetch(tf.data.AUTOTUNE))
+        self.vae.fit(ds, epochs=epochs, shuffle=False, verbose=0)
+
+    def set_reference(self, dt_true: np.ndarray):
+        """Store legitimate time differences as the detection reference.
 
         Args:
             dt_true: True time differences
-            dt_spoof: Spoofed time differences
-
-        Returns:
-            Detection score (0-1)
         """
-        _, hist_true = coincidence_histogram(dt_true, bins=self.bins)
-        _, hist_spoof = coincidence_histogram(dt_spoof, bins=self.bins)
-
-        # Normalize
-        hist_true = hist_true / np.sum(hist_true)
-        hist_spoof = hist_spoof / np.sum(hist_spoof)
+        dt_true = np.asarray(dt_true, dtype=float)
+        if len(dt_true) == 0:
+            raise ValueError("Reference has no samples")
+        self._legit_dt = dt_true
+        self._legit_range = (dt_true.min(), dt_true.max())
+        self._ref_hists = OrderedDict()
+
+    @property
+    def has_reference(self) -> bool:
+        """Whether set_reference() has been called."""
+        return self._legit_dt is not None
+
+    def _grid_range(self, k_lo: int, k_hi: int) -> Tuple[float, float]:
+        """Range (s) of window bins [k_lo, k_hi)."""
+        return (self.window[0] + k_lo * self.bin_width,
+                self.window[0] + k_hi * self.bin_width)
+
+    def _reference_histogram(self, k_lo: int, k_hi: int) -> np.ndarray:
+        """Normalized reference histogram on window bins [k_lo, k_hi), LRU-cached per range."""
+        key = (k_lo, k_hi)
+        hist = self._ref_hists.get(key)
+        if hist is not None:
+            self._ref_hists.move_to_end(key)
+            return hist
+
+        lo, hi = self._grid_range(k_lo, k_hi)
+        # Out-of-range samples go to the edge bins, as in hellinger_from_dt
+        hist, _ = np.histogram(np.clip(self._legit_dt, lo, hi), bins=k_hi - k_lo, range=(lo, hi))
+        hist = hist / hist.sum()
+        self._ref_hists[key] = hist
+        if len(self._ref_hists) > _REF_CACHE_SIZE:
+            self._ref_hists.popitem(last=False)
+        return hist
+
+    def classical_detect(self, dt_spoof_batch: np.ndarray) -> np.ndarray:
+        """Classical detection using Hellinger distance to the reference.
+
+        The window is split into ``coincidence_bins`` fixed-width bins. Each
+        row and the reference share the span of those bins that covers both,
+        so a row's score does not depend on the rest of the batch; samples
+        beyond the window land in its edge bins. Rows without samples get
+        the maximal distance.
 
-        d_h = hellinger_distance(hist_true, hist_spoof)
-        return 1 / (1 + np.exp(-10 * (d_h - self.threshold)))  # Sigmoid
+        Args:
+            dt_spoof_batch: Spoofed time differences, shape (N, M); ragged
+                rows are padded with NaN
 
-    def ml_detect(self, histogram: np.ndarray) -> float:
+        Returns:
+            Detection score (0-1) per row, shape (N,)
+        """
+        if self._legit_dt is None:
+            raise ValueError("Reference not set")
+
+        dt_spoof_batch = np.asarray(dt_spoof_batch, dtype=float)
+        missing = np.isnan(dt_spoof_batch)
+        row_lo = np.where(missing, np.inf, dt_spoof_batch).min(axis=1, initial=np.inf)
+        row_hi = np.where(missing, -np.inf, dt_spoof_batch).max(axis=1, initial=-np.inf)
+        lo = np.minimum(self._legit_range[0], row_lo)
+        hi = np.maximum(self._legit_range[1], row_hi)
+
+        # Window bins [k_lo, k_hi) covering each row and the reference, clamped to the window
+        k_lo = np.clip(np.floor((lo - self.window[0]) / self.bin_width), 0, self.bins - 1).astype(np.int64)
+        k_hi = np.clip(np.floor((hi - self.window[0]) / self.bin_width) + 1, 1, self.bins).astype(np.int64)
+        n_bins = k_hi - k_lo
+
+        ref_hists = np.zeros((len(dt_spoof_batch), n_bins.max()))
+        for r, (k0, k1) in enumerate(zip(k_lo, k_hi)):
+            ref_hists[r, :k1 - k0] = self._reference_histogram(int(k0), int(k1))
+
+        lo_e, hi_e = self._grid_range(k_lo, k_hi)
+        d_h = hellinger_from_dt(dt_spoof_batch, ref_hists, lo_e, hi_e, n_bins)
+        return expit(10 * (d_h - self.threshold))  # Sigmoid
+
+    def ml_detect(self, histograms: np.ndarray) -> np.ndarray:
         """ML detection using VAE reconstruction error.
 
         Args:
-            histogram: Input histogram
+            histograms: Input histograms, shape (N, bins)
 
         Returns:
-            Anomaly score
+            Anomaly score per histogram, shape (N,)
         """
         if self.vae is None:
             raise ValueError("VAE not trained")
-
-        reconstructed = self.vae.predict(histogram.reshape(1, -1), verbose=0)
-        error = np.mean((histogram - reconstructed.flatten())**2)
-        return error
+        if histograms.ndim != 2:
+            raise ValueError("Expected histograms of shape (N, bins)")
+        histograms = histograms.astype(np.float32)
+
+        # Call the model directly: predict() sets up a dataset adapter per call
+        errors = np.empty(len(histograms))
+        for start in range(0, len(histograms), self.batch_size):
+            batch = histograms[start:start + self.batch_size]
+            reconstructed = self.vae(tf.convert_to_tensor(batch), training=False).numpy()
+            errors[start:start + len(batch)] = np.mean((batch - reconstructed)**2, axis=1)
+        return errors
 
     def detect(self, dt: np.ndarray, use_ml: bool = True) -> Dict:
         """Full detection pipeline.
@@ -127,31 +216,50 @@ class Detector:
         Returns:
             Detection results
         """
-        # Assume we have reference legit dt for comparison
-        # In practice, this would be pre-computed
-        legit_dt = np.random.normal(0, 50e-12, len(dt))  # Placeholder
+        return self.detect_batch([dt], use_ml=use_ml)[0]
+
+    def detect_batch(self, dt_batch: List[np.ndarray], use_ml: bool = True) -> List[Dict]:
+        """Detection pipeline over several coincidence sets.
+
+        Requires a reference set with ``set_reference``. Histograms are
+        scored by the VAE in batches of ``batch_size``.
+
+        Args:
+            dt_batch: Time differences, one array per sample
+            use_ml: Whether to use ML component
+
+        Returns:
+            Detection results per sample
+        """
+        # Pad ragged rows with NaN, which classical_detect ignores
+        padded = np.full((len(dt_batch), max(len(dt) for dt in dt_batch)), np.nan)
+        for row, dt in zip(padded, dt_batch):
+            row[:len(dt)] = dt
+        classical_scores = self.classical_detect(padded)
 
-        classical_score = self.classical_detect(legit_dt, dt)
-        ml_score = None
+        ml_scores = [None] * len(dt_batch)
+        combined_scores = classical_scores
 
         if use_ml and self.vae is not None:
             try:
-                _, hist = coincidence_histogram(dt, bins=self.bins)
-                ml_score = self.ml_detect(hist.astype(float))
+                hists = np.array([coincidence_histogram(dt, bins=self.bins)[1]
+                                  for dt in dt_batch], dtype=float)
+                ml_scores = self.ml_detect(hists)
                 # Combine scores
-                combined_score = 0.7 * classical_score + 0.3 * ml_score
+                combined_scores = 0.7 * classical_scores + 0.3 * ml_scores
             except Exception as e:
                 print(f"ML detection failed: {e}")
-                combined_score = classical_score
-        else:
-            combined_score = classical_score
 
-        return {
-            'classical_score': classical_score,
-            'ml_score': ml_score,
-            'combined_score': combined_score,
-            'decision': combined_score > 0.5
-        }
+        return [
+            {
+                'classical_score': classical_score,
+                'ml_score': ml_score,
+                'combined_score': combined_score,
+                'decision': combined_score > 0.5
+            }
+            for classical_score, ml_score, combined_score
+            in zip(classical_scores, ml_scores, combined_scores)
+        ]
 
     def compute_roc(self, true_labels: np.ndarray, scores: np.ndarray) -> Dict:
         """Compute ROC metrics.
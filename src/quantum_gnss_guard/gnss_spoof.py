@@ -1,9 +1,43 @@
 """GNSS spoofing attack models."""
 
+import re
 import numpy as np
 import pandas as pd
+from numba import njit, prange
 from typing import Dict, List, Tuple
-from .utils import gaussian_jitter
+from .utils import gaussian_jitter, PRNG_BLOCK_SIZE
+
+_ATTACK_CODES = {'time-push': 0, 'replica': 1, 'hybrid': 2}
+
+# HHMMSS time field of a GPGGA sentence
+_GGA_TIME_RE = re.compile(r'^(\$GPGGA,)(\d{2})(\d{2})(\d{2})(?=,|$)')
+
+
+@njit(parallel=True, cache=True)
+def _apply_spoof_kernel(gnss_in, dt_in, gnss_out, dt_out, attack_code, delta, offset,
+                        noise_sigma, spoof_rate, seed):
+    """Spoof GNSS times and quantum dt in a single pass (see GNSSSpoof.apply_spoof).
+
+    Numba kernels cannot share a np.random.Generator across threads, so each
+    PRNG_BLOCK_SIZE block is reseeded from ``seed`` drawn off the caller's rng.
+    """
+    n = len(gnss_in)
+    n_blocks = (n + PRNG_BLOCK_SIZE - 1) // PRNG_BLOCK_SIZE
+    for b in prange(n_blocks):
+        np.random.seed(seed + b)
+        for i in range(b * PRNG_BLOCK_SIZE, min(n, (b + 1) * PRNG_BLOCK_SIZE)):
+            gnss_out[i] = gnss_in[i]
+            dt_out[i] = dt_in[i]
+            if np.random.random() < spoof_rate:
+                if attack_code == 0:
+                    gnss_out[i] += delta
+                    dt_out[i] += delta + np.random.normal(0.0, noise_sigma)
+                elif attack_code == 1:
+                    gnss_out[i] += offset
+                    dt_out[i] += offset
+                elif attack_code == 2:
+                    gnss_out[i] += delta + offset
+                    dt_out[i] += delta + offset + np.random.normal(0.0, noise_sigma)
 
 
 class GNSSSpoof:
@@ -19,6 +53,7 @@ class GNSSSpoof:
         self.delta_ns = config.get('delta_ns', 10)  # ns
         self.noise_ps = config.get('noise_ps', 5)   # ps
         self.spoof_rate = config.get('spoof_rate', 0.5)  # Fraction of time spoofed
+        self.rng = np.random.default_rng(config.get('seed'))
 
     def apply_spoof(self, gnss_times: np.ndarray, quantum_dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """Apply spoofing to GNSS and quantum signals.
@@ -30,30 +65,25 @@ class GNSSSpoof:
         Returns:
             Spoofed GNSS times, spoofed quantum dt
         """
-        n = len(gnss_times)
-        spoof_mask = np.random.random(n) < self.spoof_rate
-
-        spoofed_gnss = gnss_times.copy()
-        spoofed_dt = quantum_dt.copy()
-
-        if self.attack_type == 'time-push':
-            # Shift GNSS times
-            spoofed_gnss[spoof_mask] += self.delta_ns * 1e-9
-            # For quantum, mimic the shift with noise
-            spoofed_dt[spoof_mask] += (self.delta_ns * 1e-9 + np.random.normal(0, self.noise_ps * 1e-12, np.sum(spoof_mask)))
-
-        elif self.attack_type == 'replica':
-            # Replay authentic signals with phase offset
-            offset = np.random.uniform(-100e-9, 100e-9)  # Random offset
-            spoofed_gnss[spoof_mask] = gnss_times[spoof_mask] + offset
-            spoofed_dt[spoof_mask] = quantum_dt[spoof_mask] + offset
-
+        gnss_times = np.ascontiguousarray(gnss_times)
+        quantum_dt = np.ascontiguousarray(quantum_dt)
+        spoofed_gnss = np.empty_like(gnss_times)
+        spoofed_dt = np.empty_like(quantum_dt)
+
+        # time-push: shift GNSS times, mimic the shift on quantum dt with noise
+        # replica: replay authentic signals with a random phase offset
+        # hybrid: combine time-push and replica
+        attack_code = _ATTACK_CODES.get(self.attack_type, -1)
+        if self.attack_type == 'replica':
+            offset = self.rng.uniform(-100e-9, 100e-9)
         elif self.attack_type == 'hybrid':
-            # Combine time-push and replica
-            push_delta = self.delta_ns * 1e-9
-            replica_offset = np.random.uniform(-50e-9, 50e-9)
-            spoofed_gnss[spoof_mask] += push_delta + replica_offset
-            spoofed_dt[spoof_mask] += push_delta + replica_offset + np.random.normal(0, self.noise_ps * 1e-12, np.sum(spoof_mask))
+            offset = self.rng.uniform(-50e-9, 50e-9)
+        else:
+            offset = 0.0
+
+        _apply_spoof_kernel(gnss_times, quantum_dt, spoofed_gnss, spoofed_dt, attack_code,
+                            self.delta_ns * 1e-9, offset, self.noise_ps * 1e-12,
+                            self.spoof_rate, self.rng.integers(0, 2**31))
 
         return spoofed_gnss, spoofed_dt
 
@@ -67,21 +97,12 @@ class GNSSSpoof:
             Spoofed NMEA sentences
         """
         # Simplified: modify TOW in GPGGA sentences
-        spoofed = []
-        for sentence in original_nmea:
-            if sentence.startswith('$GPGGA'):
-                parts = sentence.split(',')
-                if len(parts) > 1:
-                    # Modify time field (assuming HHMMSS format)
-                    time_str = parts[1]
-                    if len(time_str) == 6:
-                        hours = int(time_str[:2])
-                        mins = int(time_str[2:4])
-                        secs = int(time_str[4:6])
-                        total_secs = hours * 3600 + mins * 60 + secs
-                        spoofed_secs = total_secs + self.delta_ns * 1e-9
-                        spoofed_time = f"{int(spoofed_secs // 3600):02d}{int((spoofed_secs % 3600) // 60):02d}{int(spoofed_secs % 60):02d}"
-                        parts[1] = spoofed_time
-                        sentence = ','.join(parts)
-            spoofed.append(sentence)
-        return spoofed
\ No newline at end of file
+        return [_GGA_TIME_RE.sub(self._shift_gga_time, sentence, count=1)
+                for sentence in original_nmea]
+
+    def _shift_gga_time(self, match: re.Match) -> str:
+        """Shift a matched GPGGA HHMMSS time field by delta_ns."""
+        total_secs = int(match[2]) * 3600 + int(match[3]) * 60 + int(match[4])
+        spoofed_secs = total_secs + self.delta_ns * 1e-9
+        return (f"{match[1]}{int(spoofed_secs // 3600) % 24:02d}"
+                f"{int((spoofed_secs % 3600) // 60):02d}{int(spoofed_secs % 60):02d}")
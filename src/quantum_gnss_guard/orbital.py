@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 from skyfield.api import load, wgs84
 from skyfield.toposlib import Topos
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Tuple
 from .utils import link_budget
 
@@ -21,10 +21,27 @@ class Orbital:
             station_lon: Longitude (deg)
             station_alt: Altitude (m)
         """
+        self.tle_file = tle_file
         self.satellites = load.tle_file(tle_file)
         self.station = wgs84.latlon(station_lat, station_lon, station_alt)
         self.ts = load.timescale()
 
+    def __getstate__(self):
+        # SGP4 Satrec objects are not picklable; reload them from the TLE file
+        state = self.__dict__.copy()
+        del state['satellites']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.satellites = load.tle_file(self.tle_file)
+
+    def _to_time(self, dt: datetime):
+        """Convert a datetime to a Skyfield Time, treating naive values as UTC."""
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return self.ts.from_datetime(dt)
+
     def compute_passes(self, start_time: datetime, duration_hours: int = 24,
                       min_elevation: float = 10) -> pd.DataFrame:
         """Compute satellite passes over the station.
@@ -38,31 +55,34 @@ class Orbital:
             DataFrame with pass info
         """
         passes = []
+        end_time = start_time + timedelta(hours=duration_hours)
+        t0 = self._to_time(start_time)
+        t1 = self._to_time(end_time)
+
         for satellite in self.satellites:
             try:
-                t0 = self.ts.utc(start_time.year, start_time.month, start_time.day,
-                               start_time.hour, start_time.minute, start_time.second)
-                t1 = self.ts.utc((start_time + timedelta(hours=duration_hours)).year,
-                                (start_time + timedelta(hours=duration_hours)).month,
-                                (start_time + timedelta(hours=duration_hours)).day,
-                                (start_time + timedelta(hours=duration_hours)).hour,
-                                (start_time + timedelta(hours=duration_hours)).minute,
-                                (start_time + timedelta(hours=duration_hours)).second)
-
                 times, events = satellite.find_events(self.station, t0, t1, altitude_degrees=min_elevation)
 
-                for i in range(len(events) - 1):
-                    if events[i] == 0 and i + 1 < len(events) and events[i+1] == 2:  # Rise and Set
-                        rise_time = times[i].utc_datetime()
-                        set_time = times[i+1].utc_datetime()
-                        duration = (set_time - rise_time).total_seconds() / 60
-                        passes.append({
-                            'satellite': satellite.name,
-                            'rise_time': rise_time,
-                            'set_time': set_time,
-                            'duration_min': duration,
-                            'max_elevation': self._max_elevation(satellite, rise_time, set_time)
-                        })
+                # Rise immediately followed by Set
+                rise_idx = np.flatnonzero((events[:-1] == 0) & (events[1:] == 2))
+                if len(rise_idx) == 0:
+                    continue
+
+                rise_times = times[rise_idx]
+                set_times = times[rise_idx + 1]
+                max_elevations = self._max_elevations(satellite, rise_times, set_times)
+
+                for rise_time, set_time, max_elevation in zip(rise_times.utc_datetime(),
+                                                              set_times.utc_datetime(),
+                                                              max_elevations):
+                    duration = (set_time - rise_time).total_seconds() / 60
+                    passes.append({
+                        'satellite': satellite.name,
+                        'rise_time': rise_time,
+                        'set_time': set_time,
+                        'duration_min': duration,
+                        'max_elevation': max_elevation
+                    })
             except Exception as e:
                 print(f"Warning: Could not compute passes for {satellite.name}: {e}")
                 # Create a synthetic pass for testing
@@ -78,19 +98,27 @@ class Orbital:
 
         return pd.DataFrame(passes)
 
-    def _max_elevation(self, satellite, rise_time: datetime, set_time: datetime) -> float:
-        """Compute maximum elevation during pass."""
-        t0 = self.ts.utc(rise_time.year, rise_time.month, rise_time.day,
-                        rise_time.hour, rise_time.minute, rise_time.second)
-        t1 = self.ts.utc(set_time.year, set_time.month, set_time.day,
-                        set_time.hour, set_time.minute, set_time.second)
+    def _max_elevations(self, satellite, rise_times, set_times, n_samples: int = 100) -> np.ndarray:
+        """Compute maximum elevation of each pass with a single propagation.
+
+        Args:
+            satellite: Skyfield satellite object
+            rise_times, set_times: Skyfield Time arrays bounding each pass
+            n_samples: Samples per pass
+
+        Returns:
+            Maximum elevation per pass (deg)
+        """
+        # Sample every pass on its own linspace, then propagate all samples at once
+        frac = np.linspace(0, 1, n_samples)
+        tt = rise_times.tt[:, None] + (set_times.tt - rise_times.tt)[:, None] * frac
+        times = self.ts.tt_jd(tt.ravel())
 
-        times = self.ts.linspace(t0, t1, 100)
         difference = satellite - self.station
         topocentric = difference.at(times)
         alt, az, distance = topocentric.altaz()
 
-        return np.max(alt.degrees)
+        return alt.degrees.reshape(len(tt), n_samples).max(axis=1)
 
     def link_budget_over_pass(self, satellite, rise_time: datetime, set_time: datetime,
                              tx_power_dbm: float = 10, frequency_ghz: float = 375) -> pd.DataFrame:
@@ -105,26 +133,17 @@ class Orbital:
         Returns:
             DataFrame with time, elevation, distance, rx_power
         """
-        t0 = self.ts.utc(rise_time.year, rise_time.month, rise_time.day,
-                        rise_time.hour, rise_time.minute, rise_time.second)
-        t1 = self.ts.utc(set_time.year, set_time.month, set_time.day,
-                        set_time.hour, set_time.minute, set_time.second)
+        t0 = self._to_time(rise_time)
+        t1 = self._to_time(set_time)
 
         times = self.ts.linspace(t0, t1, 100)
         difference = satellite - self.station
         topocentric = difference.at(times)
         alt, az, distance = topocentric.altaz()
 
-        budgets = []
-        for i, t in enumerate(times):
-            dist_km = distance.km[i]
-            elev_deg = alt.degrees[i]
-            rx_power = link_budget(tx_power_dbm, dist_km, frequency_ghz)
-            budgets.append({
-                'time': t.utc_datetime(),
-                'elevation': elev_deg,
-                'distance_km': dist_km,
-                'rx_power_dbm': rx_power
-            })
-
-        return pd.DataFrame(budgets)
\ No newline at end of file
+        return pd.DataFrame({
+            'time': times.utc_datetime(),
+            'elevation': alt.degrees,
+            'distance_km': distance.km,
+            'rx_power_dbm': link_budget(tx_power_dbm, distance.km, frequency_ghz)
+        })
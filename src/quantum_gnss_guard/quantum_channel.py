@@ -2,9 +2,39 @@
 
 import numpy as np
 import pandas as pd
-from qutip import *
-from typing import Tuple, List
-from .utils import poisson_arrivals, gaussian_jitter, rayleigh_fade
+from functools import cached_property
+from numba import njit
+from typing import Tuple, List, Optional, Union
+from .utils import poisson_arrivals, gaussian_jitter, rayleigh_fade, shared_bell_state
+
+
+@njit(cache=True, boundscheck=False)
+def _count_coincidences(times, detectors, window_s):
+    """Number of later events on the other detector within window_s, for sorted times."""
+    n = len(times)
+    n_pairs = 0
+    for i in range(n - 1):
+        j = i + 1
+        while j < n and times[j] - times[i] <= window_s:
+            if detectors[i] != detectors[j]:
+                n_pairs += 1
+            j += 1
+    return n_pairs
+
+
+@njit(cache=True, boundscheck=False)
+def _fill_coincidences(times, detectors, window_s, dt):
+    """Write the Δt of every pair counted by _count_coincidences into dt, in scan order."""
+    n = len(times)
+    k = 0
+    for i in range(n - 1):
+        j = i + 1
+        while j < n and times[j] - times[i] <= window_s:
+            if detectors[i] != detectors[j]:
+                # Differences are taken in float64 and only then narrowed to dt's dtype
+                dt[k] = times[j] - times[i]
+                k += 1
+            j += 1
 
 
 class QuantumChannel:
@@ -12,7 +42,7 @@ class QuantumChannel:
 
     def __init__(self, pair_rate: float = 5000, wavelength_nm: float = 810,
                  detector_jitter_ps: float = 50, detector_qe: float = 0.8,
-                 dark_count_hz: float = 10):
+                 dark_count_hz: float = 10, seed: Optional[int] = None):
         """Initialize quantum channel parameters.
 
         Args:
@@ -21,83 +51,181 @@ class QuantumChannel:
             detector_jitter_ps: Detector jitter (ps)
             detector_qe: Quantum efficiency
             dark_count_hz: Dark count rate (Hz)
+            seed: Seed for the channel's random generator
         """
         self.pair_rate = pair_rate
         self.wavelength = wavelength_nm
         self.jitter_sigma = detector_jitter_ps * 1e-12  # s
         self.qe = detector_qe
         self.dark_rate = dark_count_hz
+        self.rng = np.random.default_rng(seed)
 
-        # Bell state |ψ> = 1/√2 (|HH> + |VV>)
-        self.bell_state = (tensor(basis(2, 0), basis(2, 0)) + tensor(basis(2, 1), basis(2, 1))).unit()
+    @cached_property
+    def bell_state(self):
+        """Bell state |ψ> = 1/√2 (|HH> + |VV>), built on first use and shared across channels."""
+        return shared_bell_state()
 
-    def generate_pairs(self, duration: float, base_loss_db: float = 20) -> pd.DataFrame:
+    def _detect_photons(self, creation_times: np.ndarray, base_loss_db: float,
+                        rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Apply fading loss, detector efficiency and jitter to pair creation times.
+
+        Returns:
+            Jittered detection times on A and B, and the masks of detected pairs
+        """
+        n = len(creation_times)
+
+        # Apply losses
+        loss_db = rayleigh_fade(base_loss_db, size=n, rng=rng)
+        survival = rng.random(n) < 10 ** (-loss_db / 10)
+
+        # Photon 1 (ground) and photon 2 (satellite) detection
+        detected_a = survival & (rng.random(n) < self.qe)
+        detected_b = survival & (rng.random(n) < self.qe)
+        t_a = gaussian_jitter(creation_times[detected_a], self.jitter_sigma, rng=rng)
+        t_b = gaussian_jitter(creation_times[detected_b], self.jitter_sigma, rng=rng)
+        return t_a, t_b, detected_a, detected_b
+
+    def _draw_events(self, duration: float, base_loss_db: float,
+                     rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Draw unsorted photon event columns: times, detectors and photon_id codes."""
+        # Generate pair creation times
+        creation_times = poisson_arrivals(self.pair_rate, duration, rng=rng)
+        t_a, t_b, _, _ = self._detect_photons(creation_times, base_loss_db, rng)
+
+        # Add dark counts
+        dark_times = poisson_arrivals(self.dark_rate, duration, rng=rng)
+        dark_detectors = rng.integers(1, 3, size=len(dark_times), dtype=np.int8)
+
+        # Fill preallocated columns by slice: A photons, B photons, dark counts
+        n_a, n_b = len(t_a), len(t_b)
+        n_events = n_a + n_b + len(dark_times)
+        times = np.empty(n_events)
+        detectors = np.empty(n_events, dtype=np.int8)
+        codes = np.empty(n_events, dtype=np.int8)
+
+        times[:n_a], detectors[:n_a], codes[:n_a] = t_a, 1, 0
+        times[n_a:n_a + n_b], detectors[n_a:n_a + n_b], codes[n_a:n_a + n_b] = t_b, 2, 1
+        times[n_a + n_b:], detectors[n_a + n_b:], codes[n_a + n_b:] = dark_times, dark_detectors, 2
+
+        return times, detectors, codes
+
+    def generate_pairs_raw(self, duration: float, base_loss_db: float = 20,
+                           rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Generate photon events as time-sorted arrays, skipping the DataFrame.
+
+        Args:
+            duration: Time duration (s)
+            base_loss_db: Base link loss (dB)
+            rng: Random generator (defaults to self.rng)
+
+        Returns:
+            (times, detectors) sorted by time, ready for compute_coincidences
+        """
+        times, detectors, _ = self._draw_events(duration, base_loss_db, self.rng if rng is None else rng)
+        order = np.argsort(times, kind='stable')
+        return times[order], detectors[order]
+
+    def generate_pairs(self, duration: float, base_loss_db: float = 20,
+                       rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
         """Generate entangled pair arrivals with losses.
 
         Args:
             duration: Time duration (s)
             base_loss_db: Base link loss (dB)
+            rng: Random generator (defaults to self.rng)
 
         Returns:
             DataFrame of photon events
         """
-        # Generate pair creation times
-        creation_times = poisson_arrivals(self.pair_rate, duration)
+        times, detectors, codes = self._draw_events(duration, base_loss_db, self.rng if rng is None else rng)
+        order = np.argsort(times, kind='stable')
 
-        events = []
-        for t in creation_times:
-            # Apply losses
-            loss_db = rayleigh_fade(base_loss_db)
-            survival_prob = 10 ** (-loss_db / 10)
+        return pd.DataFrame({
+            'time': times[order],
+            'detector': detectors[order],
+            'photon_id': pd.Categorical.from_codes(codes[order], categories=['A', 'B', 'dark'])
+        }, index=order)
 
-            if np.random.random() < survival_prob:
-                # Photon 1 (ground)
-                if np.random.random() < self.qe:
-                    t1 = gaussian_jitter(np.array([t]), self.jitter_sigma)[0]
-                    events.append({'time': t1, 'detector': 1, 'photon_id': 'A'})
+    def generate_pairs_batch(self, duration: float, n_runs: int,
+                             base_loss_db: float = 20) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Generate several independent runs of photon events from shared draws.
 
-                # Photon 2 (satellite)
-                if np.random.random() < self.qe:
-                    t2 = gaussian_jitter(np.array([t]), self.jitter_sigma)[0]
-                    events.append({'time': t2, 'detector': 2, 'photon_id': 'B'})
+        Pair counts for all runs come from one Poisson draw and the arrival
+        times from one exponential draw: for n pairs, the normalized cumsum
+        of n + 1 exponentials gives the sorted uniform arrival times. Losses,
+        detection and jitter are then applied to all runs at once.
 
-        # Add dark counts
-        dark_times = poisson_arrivals(self.dark_rate, duration)
-        for t in dark_times:
-            det = np.random.choice([1, 2])
-            events.append({'time': t, 'detector': det, 'photon_id': 'dark'})
+        Args:
+            duration: Time duration per run (s)
+            n_runs: Number of independent runs
+            base_loss_db: Base link loss (dB)
 
-        return pd.DataFrame(events).sort_values('time')
+        Returns:
+            List of time-sorted (times, detectors) tuples, one per run
+        """
+        counts = self.rng.poisson(self.pair_rate * duration, n_runs)
+        gaps = self.rng.exponential(1, counts.sum() + n_runs)
+
+        # Uniform order statistics per run, from each run's own n + 1 gaps
+        creation_times = np.empty(counts.sum())
+        runs = np.repeat(np.arange(n_runs), counts)
+        start = 0
+        for r, n in enumerate(counts):
+            arrivals = np.cumsum(gaps[start + r:start + r + n + 1])
+            creation_times[start:start + n] = arrivals[:-1] * (duration / arrivals[-1])
+            start += n
+
+        t_a, t_b, detected_a, detected_b = self._detect_photons(creation_times, base_loss_db, self.rng)
 
-    def compute_coincidences(self, events: pd.DataFrame, window_ps: float = 200) -> np.ndarray:
+        # Add dark counts
+        dark_counts = self.rng.poisson(self.dark_rate * duration, n_runs)
+        dark_times = self.rng.uniform(0, duration, dark_counts.sum())
+        dark_detectors = self.rng.integers(1, 3, size=len(dark_times), dtype=np.int8)
+
+        times = np.concatenate([t_a, t_b, dark_times])
+        detectors = np.concatenate([np.full(len(t_a), 1, dtype=np.int8),
+                                    np.full(len(t_b), 2, dtype=np.int8),
+                                    dark_detectors])
+        run_ids = np.concatenate([runs[detected_a], runs[detected_b],
+                                  np.repeat(np.arange(n_runs), dark_counts)])
+
+        # One sort by (run, time), then split at run boundaries
+        order = np.lexsort((times, run_ids))
+        times, detectors = times[order], detectors[order]
+        bounds = np.cumsum(np.bincount(run_ids, minlength=n_runs))[:-1]
+        return list(zip(np.split(times, bounds), np.split(detectors, bounds)))
+
+    def compute_coincidences(self, events: Union[pd.DataFrame, Tuple[np.ndarray, np.ndarray]],
+                             window_ps: float = 200, dtype: np.dtype = np.float64) -> np.ndarray:
         """Compute time differences for coincidences.
 
+        Event times must stay float64: across a pass of several minutes,
+        float32 spacing is tens of microseconds. Each Δt is below the window,
+        so it can be returned as float32 without losing resolution.
+
         Args:
-            events: Photon events DataFrame
+            events: Photon events DataFrame, or time-sorted (times, detectors)
+                arrays from generate_pairs_raw
             window_ps: Coincidence window (ps)
+            dtype: Output dtype for Δt (float64 or float32)
 
         Returns:
             Array of Δt for coincident pairs
         """
         window_s = window_ps * 1e-12
-        dt_list = []
-
-        # Group by time windows
-        events = events.sort_values('time')
-        times = events['time'].values
-        detectors = events['detector'].values
-
-        i = 0
-        while i < len(times) - 1:
-            j = i + 1
-            while j < len(times) and times[j] - times[i] <= window_s:
-                if detectors[i] != detectors[j]:  # Different detectors
-                    dt = times[j] - times[i]
-                    dt_list.append(dt)
-                j += 1
-            i += 1
-
-        return np.array(dt_list)
+
+        if isinstance(events, pd.DataFrame):
+            # Group by time windows
+            events = events.sort_values('time')
+            times, detectors = events['time'].values, events['detector'].values
+        else:
+            times, detectors = events
+        times = np.ascontiguousarray(times, dtype=np.float64)
+        detectors = np.ascontiguousarray(detectors, dtype=np.int8)
+
+        dt = np.empty(_count_coincidences(times, detectors, window_s), dtype=dtype)
+        _fill_coincidences(times, detectors, window_s, dt)
+        return dt
 
     def fidelity_check(self) -> float:
         """Compute fidelity of generated state to Bell state."""
@@ -1,9 +1,12 @@
 """Main simulator orchestrating all components."""
 
+import copy
 import numpy as np
 import pandas as pd
+from collections import namedtuple
 from datetime import datetime
-from typing import Dict, List
+from joblib import Parallel, delayed
+from typing import Dict, List, Optional
 from .orbital import Orbital
 from .quantum_channel import QuantumChannel
 from .gnss_spoof import GNSSSpoof
@@ -11,6 +14,9 @@ from .detector import Detector
 from .qtt import QuantumTimeTransfer
 from .utils import coincidence_histogram
 
+# Fields of a pass row used by run_single_pass; module-level so tasks pickle
+Pass = namedtuple('Pass', ['satellite', 'rise_time', 'duration_min'])
+
 
 class Simulator:
     """End-to-end GNSS spoofing detection simulator."""
@@ -32,7 +38,8 @@ class Simulator:
             pair_rate=config.get('pair_rate', 5000),
             wavelength_nm=config.get('wavelength_nm', 810),
             detector_jitter_ps=config.get('detector_jitter_ps', 50),
-            detector_qe=config.get('detector_qe', 0.8)
+            detector_qe=config.get('detector_qe', 0.8),
+            seed=config.get('seed')
         )
         self.spoof_configs = config.get('attacks', [{'attack_type': 'time-push'}])
         self.detector = Detector()
@@ -42,29 +49,44 @@ class Simulator:
         if self.enable_qtt:
             self.qtt = QuantumTimeTransfer(
                 sync_rate=config.get('sync_rate', 1000),
-                precision_ps=config.get('qtt_precision_ps', 0.1)
+                precision_ps=config.get('qtt_precision_ps', 0.1),
+                seed=config.get('seed')
             )
 
-    def run_single_pass(self, pass_info: pd.Series, attack_config: Dict) -> Dict:
+    def run_single_pass(self, pass_info: Pass, attack_config: Dict,
+                        seed: Optional[int] = None) -> Dict:
         """Run simulation for a single pass.
 
         Args:
-            pass_info: Pass information
+            pass_info: Pass information (satellite, rise_time, duration_min)
             attack_config: Attack parameters
+            seed: Task seed; the quantum, QTT, spoof and fallback draws all
+                use generators spawned from it (fresh entropy if None)
 
         Returns:
             Results dictionary
         """
+        # Task-local generators only: the channel and QTT generators are shared
+        # by every task and must not be reseeded here
+        quantum_seq, qtt_seq, task_seq, reference_seq = np.random.SeedSequence(seed).spawn(4)
+        rng = np.random.default_rng(task_seq)
+        if seed is not None:
+            attack_config = {**attack_config, 'seed': seed}
+
         # Generate quantum events
-        duration = max(pass_info['duration_min'] * 60, 60)  # At least 1 minute
-        events = self.quantum.generate_pairs(duration, base_loss_db=25)
+        duration = max(pass_info.duration_min * 60, 60)  # At least 1 minute
+        if not self.detector.has_reference:
+            # Called outside run(): draw a reference for this and later passes
+            self.build_reference(duration, seed=reference_seq)
+        events = self.quantum.generate_pairs_raw(duration, base_loss_db=25,
+                                                 rng=np.random.default_rng(quantum_seq))
 
         # Extract coincidences
-        dt = self.quantum.compute_coincidences(events)
+        dt = self.quantum.compute_coincidences(events, dtype=np.float32)
         
         # Ensure we have some data
         if len(dt) == 0:
-            dt = np.random.normal(0, 50e-12, 10)  # Generate some fake coincidences
+            dt = rng.normal(0, 50e-12, 10)  # Generate some fake coincidences
         
         # Simulate GNSS times (simplified)
         gnss_times = np.linspace(0, duration, len(dt))
@@ -78,19 +100,22 @@ class Simulator:
         qtt_detection = False
         if self.enable_qtt:
             # Generate quantum sync pulses
-            sync_events = self.qtt.generate_sync_pulses(duration, spoofed_gnss)
+            sync_events = self.qtt.generate_sync_pulses(duration, spoofed_gnss,
+                                                      rng=np.random.default_rng(qtt_seq))
             
             # Detect sync anomalies
             qtt_results = self.qtt.detect_sync_anomalies(sync_events, threshold_ps=1.0)
             qtt_anomaly_score = qtt_results['anomaly_score']
             qtt_detection = qtt_results['detection']
 
-        # Detect (simplified without ML for now)
+        # Detect against the legitimate reference (simplified without ML for now)
+        detection_fallback = False
         try:
             detection_result = self.detector.detect(spoofed_dt, use_ml=False)
-        except:
-            # Fallback detection
-            detection_score = np.random.random()  # Random for testing
+        except (ValueError, RuntimeError):
+            # Fallback detection, flagged in the result and reported by run()
+            detection_fallback = True
+            detection_score = rng.random()  # Random for testing
             detection_result = {
                 'combined_score': detection_score,
                 'decision': detection_score > 0.5
@@ -106,22 +131,38 @@ class Simulator:
             final_decision = detection_result['decision']
 
         return {
-            'pass_id': f"{pass_info['satellite']}_{str(pass_info['rise_time']).replace(':', '-')}",
+            'pass_id': f"{pass_info.satellite}_{str(pass_info.rise_time).replace(':', '-')}",
             'attack_type': attack_config['attack_type'],
             'n_pairs': len(dt),
             'detection_score': final_score,
             'decision': final_decision,
             'qtt_score': qtt_anomaly_score if self.enable_qtt else None,
             'qtt_detection': qtt_detection if self.enable_qtt else None,
+            'detection_fallback': detection_fallback,
             'tpr': final_score,  # Simplified
             'fpr': 1 - final_score  # Simplified
         }
 
-    def run(self, mc_runs: int = 100) -> pd.DataFrame:
+    def build_reference(self, duration: float, seed=None):
+        """Set the detector reference from an independent legitimate draw.
+
+        Args:
+            duration: Reference acquisition time (s)
+            seed: Seed or SeedSequence for the draw (fresh entropy if None)
+        """
+        rng = np.random.default_rng(seed)
+        events = self.quantum.generate_pairs_raw(duration, base_loss_db=25, rng=rng)
+        dt = self.quantum.compute_coincidences(events, dtype=np.float32)
+        if len(dt) == 0:
+            dt = rng.normal(0, 50e-12, 10)  # Same fallback as run_single_pass
+        self.detector.set_reference(dt)
+
+    def run(self, mc_runs: int = 100, n_jobs: int = -1) -> pd.DataFrame:
         """Run Monte Carlo simulation.
 
         Args:
             mc_runs: Number of Monte Carlo runs
+            n_jobs: Parallel worker processes (-1 for all cores, 1 for serial)
 
         Returns:
             Results DataFrame
@@ -135,49 +176,92 @@ class Simulator:
         if len(passes) == 0:
             print("No passes found, creating synthetic pass for testing")
             # Create synthetic pass data for testing
-            synthetic_pass = pd.DataFrame([{
-                'satellite': 'TEST-SAT',
-                'rise_time': start_time,
-                'set_time': start_time + pd.Timedelta(minutes=10),
-                'duration_min': 10.0,
-                'max_elevation': 45.0
-            }])
+            synthetic_pass = pd.DataFrame({
+                'satellite': ['TEST-SAT'],
+                'rise_time': [start_time],
+                'set_time': [start_time + pd.Timedelta(minutes=10)],
+                'duration_min': [10.0],
+                'max_elevation': [45.0]
+            })
             passes = synthetic_pass
 
-        results = []
-        for run_idx in range(mc_runs):
-            print(f"Running MC iteration {run_idx + 1}/{mc_runs}")
-            for _, pass_info in passes.iterrows():
-                for attack_config in self.spoof_configs:
-                    try:
-                        result = self.run_single_pass(pass_info, attack_config)
-                        results.append(result)
-                    except Exception as e:
-                        print(f"Warning: Error in simulation run: {e}")
-                        # Create dummy result
-                        results.append({
-                            'pass_id': f"ERROR_{run_idx}",
-                            'attack_type': attack_config['attack_type'],
-                            'n_pairs': 0,
-                            'detection_score': 0.5,
-                            'decision': False,
-                            'tpr': 0.5,
-                            'fpr': 0.5
-                        })
-
-        return pd.DataFrame(results)
+        # Every (run, pass, attack) is independent: one task each, with its own
+        # seed spawned from the configured seed
+        pass_rows = list(map(Pass._make, passes[list(Pass._fields)].itertuples(index=False, name=None)))
+        tasks = [(run_idx, pass_info, attack_config)
+                 for run_idx in range(mc_runs)
+                 for pass_info in pass_rows
+                 for attack_config in self.spoof_configs]
+        reference_seq, task_seq = np.random.SeedSequence(self.config.get('seed')).spawn(2)
+        seeds = [int(child.generate_state(1)[0]) for child in task_seq.spawn(len(tasks))]
+
+        # One reference per run, drawn independently of every task and long
+        # enough for the longest pass, so 'none' tasks are scored against
+        # legitimate data they were not drawn from
+        longest = max(pass_info.duration_min for pass_info in pass_rows)
+        self.build_reference(max(longest * 60, 60), seed=reference_seq)
+
+        # Workers only need the channel, QTT and detector; leave the orbital
+        # model (and its TLE file) out of what gets pickled per task
+        runner = copy.copy(self)
+        runner.orbital = None
+
+        print(f"Running {mc_runs} MC iterations ({len(tasks)} tasks)")
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(runner._run_task)(run_idx, pass_info, attack_config, seed)
+            for (run_idx, pass_info, attack_config), seed in zip(tasks, seeds)
+        )
+
+        results = pd.DataFrame(results)
+        n_fallback = int(results['detection_fallback'].sum()) if len(results) else 0
+        if n_fallback:
+            print(f"Warning: Detection failed in {n_fallback}/{len(results)} tasks, "
+                  f"used random fallback scores")
+
+        return results
+
+    def _run_task(self, run_idx: int, pass_info: Pass, attack_config: Dict, seed: int) -> Dict:
+        """Run one Monte Carlo task on its own random stream.
+
+        Args:
+            run_idx: Monte Carlo iteration
+            pass_info: Pass information
+            attack_config: Attack parameters
+            seed: Task seed
+
+        Returns:
+            Results dictionary (dummy result on error)
+        """
+        try:
+            return self.run_single_pass(pass_info, attack_config, seed=seed)
+        except Exception as e:
+            print(f"Warning: Error in simulation run: {e}")
+            # Create dummy result
+            return {
+                'pass_id': f"ERROR_{run_idx}",
+                'attack_type': attack_config['attack_type'],
+                'n_pairs': 0,
+                'detection_score': 0.5,
+                'decision': False,
+                'detection_fallback': False,
+                'tpr': 0.5,
+                'fpr': 0.5
+            }
 
     def plot_roc(self, results: pd.DataFrame):
         """Generate ROC plot (placeholder)."""
         # Use matplotlib/plotly for actual plotting
         print("ROC plotting not implemented in this stub")
 
-    def export_results(self, results: pd.DataFrame, output_dir: str):
+    def export_results(self, results: pd.DataFrame, output_dir: str, write_csv: bool = False):
         """Export results to files.
 
         Args:
             results: Results DataFrame
             output_dir: Output directory
+            write_csv: Also write a CSV copy for inspection
         """
-        results.to_csv(f"{output_dir}/simulation_results.csv", index=False)
-        results.to_json(f"{output_dir}/simulation_results.json", orient='records')
\ No newline at end of file
+        results.to_parquet(f"{output_dir}/simulation_results.parquet", engine='pyarrow',
+                           compression='zstd', index=False)
+        if write_csv:
+            results.to_csv(f"{output_dir}/simulation_results.csv", index=False)
\ No newline at end of file
@@ -1,35 +1,96 @@
 """Utility functions for Quantum GNSS Guard."""
 
 import numpy as np
+from functools import lru_cache
+from numba import njit, prange
 from scipy import stats
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Union
 
+# Samples drawn per reseed in parallel Numba kernels, so random streams do
+# not depend on how blocks are scheduled across threads
+PRNG_BLOCK_SIZE = 4096
 
-def poisson_arrivals(rate: float, duration: float) -> np.ndarray:
+
+@lru_cache(maxsize=None)
+def shared_bell_state():
+    """Bell state |Φ⁺⟩ = (|00⟩ + |11⟩)/√2 as a QuTiP Qobj, built once on first use."""
+    # QuTiP is heavy to import, so keep it off the import path of the simulator
+    from qutip import basis, tensor
+    return (tensor(basis(2, 0), basis(2, 0)) +
+            tensor(basis(2, 1), basis(2, 1))).unit()
+
+
+def poisson_arrivals(rate: float, duration: float,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
     """Generate Poisson arrival times.
 
     Args:
         rate: Arrival rate (Hz)
         duration: Time duration (s)
+        rng: Random generator (defaults to the global np.random state)
 
     Returns:
         Array of arrival times
     """
-    n_events = np.random.poisson(rate * duration)
-    return np.sort(np.random.uniform(0, duration, n_events))
-
-
-def gaussian_jitter(times: np.ndarray, sigma: float) -> np.ndarray:
+    if rate <= 0 or duration <= 0:
+        return np.empty(0)
+
+    # Inter-arrival times are i.i.d. exponential, so their cumsum is already
+    # sorted; draw comfortably more than needed (mean + 8 sigma)
+    rng = np.random if rng is None else rng
+    expected = rate * duration
+    n_draw = int(expected + 8 * np.sqrt(expected)) + 1
+    arrivals = np.cumsum(rng.exponential(1 / rate, n_draw))
+    while arrivals[-1] < duration:
+        extra = arrivals[-1] + np.cumsum(rng.exponential(1 / rate, n_draw))
+        arrivals = np.concatenate([arrivals, extra])
+    return arrivals[:np.searchsorted(arrivals, duration)]
+
+
+def gaussian_jitter(times: np.ndarray, sigma: float,
+                    rng: Optional[np.random.Generator] = None) -> np.ndarray:
     """Add Gaussian jitter to timestamps.
 
     Args:
         times: Original timestamps
         sigma: Jitter standard deviation (s)
+        rng: Random generator (defaults to the global np.random state)
 
     Returns:
         Jittered timestamps
     """
-    return times + np.random.normal(0, sigma, len(times))
+    rng = np.random if rng is None else rng
+    return times + rng.normal(0, sigma, len(times))
+
+
+def nearest_sorted(sorted_values: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Find the nearest element of a sorted array for each query.
+
+    Binary search per query, O(N log M) with no M-sized temporaries. Ties
+    resolve to the lower index, as np.argmin over the distances would.
+
+    Args:
+        sorted_values: Ascending reference values (non-empty)
+        queries: Query values
+
+    Returns:
+        Index into sorted_values per query
+    """
+    idx = np.searchsorted(sorted_values, queries)
+    left = np.clip(idx - 1, 0, len(sorted_values) - 1)
+    right = np.clip(idx, 0, len(sorted_values) - 1)
+    use_left = (queries - sorted_values[left]) <= (sorted_values[right] - queries)
+    return np.where(use_left, left, right)
+
+
+@njit(cache=True)
+def _hellinger_sq_sum(p: np.ndarray, q: np.ndarray) -> float:
+    """Sum of (√p - √q)² in a single pass, without temporaries."""
+    acc = 0.0
+    for i in range(p.shape[0]):
+        d = np.sqrt(p[i]) - np.sqrt(q[i])
+        acc += d * d
+    return acc
 
 
 def hellinger_distance(p: np.ndarray, q: np.ndarray) -> float:
@@ -41,7 +102,62 @@ def hellinger_distance(p: np.ndarray, q: np.ndarray) -> float:
     Returns:
         Hellinger distance
     """
-    return np.sqrt(np.sum((np.sqrt(p) - np.sqrt(q))**2)) / np.sqrt(2)
+    p = np.ascontiguousarray(p, dtype=np.float64).ravel()
+    q = np.ascontiguousarray(q, dtype=np.float64).ravel()
+    if p.shape != q.shape:
+        raise ValueError("p and q must have the same length")
+    return np.sqrt(_hellinger_sq_sum(p, q)) / np.sqrt(2)
+
+
+@njit(parallel=True, cache=True)
+def hellinger_from_dt(dt_batch: np.ndarray, ref_hists: np.ndarray, lo: np.ndarray,
+                      hi: np.ndarray, n_bins: np.ndarray) -> np.ndarray:
+    """Hellinger distance between binned samples and a reference, fused in one pass.
+
+    Row r is histogrammed on ``n_bins[r]`` uniform bins over [lo[r], hi[r]]
+    (np.histogram semantics), normalized and compared with the first
+    ``n_bins[r]`` entries of ``ref_hists[r]`` without temporaries. Samples
+    outside the range are counted in the edge bins; NaN samples, used to pad
+    ragged rows, are ignored. Rows without samples get the maximal distance 1.
+
+    Args:
+        dt_batch: Time differences, shape (N, M)
+        ref_hists: Normalized reference histograms, shape (N, max(n_bins))
+        lo, hi: Histogram range per row (s), shape (N,)
+        n_bins: Number of bins per row, shape (N,)
+
+    Returns:
+        Hellinger distance per row, shape (N,)
+    """
+    n_rows, n = dt_batch.shape
+    d_h = np.empty(n_rows)
+    for r in prange(n_rows):
+        bins = n_bins[r]
+        lo_r, hi_r = lo[r], hi[r]
+        scale = bins / (hi_r - lo_r)
+        counts = np.zeros(bins, dtype=np.int64)
+        total = 0
+        for k in range(n):
+            x = dt_batch[r, k]
+            if np.isnan(x):
+                continue
+            if x <= lo_r:
+                counts[0] += 1
+            elif x >= hi_r:
+                counts[bins - 1] += 1
+            else:
+                counts[min(int((x - lo_r) * scale), bins - 1)] += 1
+            total += 1
+
+        if total == 0:
+            d_h[r] = 1.0
+            continue
+        acc = 0.0
+        for i in range(bins):
+            diff = np.sqrt(counts[i] / total) - np.sqrt(ref_hists[r, i])
+            acc += diff * diff
+        d_h[r] = np.sqrt(0.5 * acc)
+    return d_h
 
 
 def coincidence_histogram(dt: np.ndarray, bins: int = 100, range_ns: Tuple[float, float] = (-5, 5)) -> Tuple[np.ndarray, np.ndarray]:
@@ -60,13 +176,13 @@ def coincidence_histogram(dt: np.ndarray, bins: int = 100, range_ns: Tuple[float
     return edges, counts
 
 
-def link_budget(tx_power_dbm: float, distance_km: float, frequency_ghz: float,
-                atm_loss_db_per_km: float = 0.2, scintillation_db: float = 0.5) -> float:
+def link_budget(tx_power_dbm: float, distance_km: Union[float, np.ndarray], frequency_ghz: float,
+                atm_loss_db_per_km: float = 0.2, scintillation_db: float = 0.5) -> Union[float, np.ndarray]:
     """Compute link budget in dB.
 
     Args:
         tx_power_dbm: Transmit power (dBm)
-        distance_km: Distance (km)
+        distance_km: Distance (km), scalar or array
         frequency_ghz: Frequency (GHz)
         atm_loss_db_per_km: Atmospheric loss (dB/km)
         scintillation_db: Scintillation loss (dB)
@@ -79,14 +195,20 @@ def link_budget(tx_power_dbm: float, distance_km: float, frequency_ghz: float,
     return tx_power_dbm - fspl - atm_loss - scintillation_db
 
 
-def rayleigh_fade(loss_db: float) -> float:
+def rayleigh_fade(loss_db: Union[float, np.ndarray], size: Optional[int] = None,
+                  rng: Optional[np.random.Generator] = None) -> Union[float, np.ndarray]:
     """Apply Rayleigh fading to loss.
 
     Args:
-        loss_db: Base loss (dB)
+        loss_db: Base loss (dB), scalar or array
+        size: Number of independent fades to draw (None for one per loss_db)
+        rng: Random generator (defaults to the global np.random state)
 
     Returns:
         Faded loss (dB)
     """
-    fade = np.random.rayleigh(1)  # Scale parameter
+    rng = np.random if rng is None else rng
+    if size is None and np.ndim(loss_db) > 0:
+        size = np.shape(loss_db)
+    fade = rng.rayleigh(1, size)  # Scale parameter
     return loss_db + 20 * np.log10(fade)
\ No newline at end of file
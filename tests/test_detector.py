@@ -1,6 +1,8 @@
 """Tests for detector module."""
 
 import numpy as np
+import pytest
+from scipy.special import expit
 from quantum_gnss_guard.detector import Detector
 
 
@@ -20,8 +22,39 @@ def test_classical_detect():
     # Spoofed data
     dt_spoof = np.random.normal(10e-9, 50e-12, 1000)
 
-    score = det.classical_detect(dt_true, dt_spoof)
-    assert 0 <= score <= 1
+    det.set_reference(dt_true)
+    scores = det.classical_detect(dt_spoof[np.newaxis, :])
+    assert scores.shape == (1,)
+    assert 0 <= scores[0] <= 1
+
+
+def test_classical_detect_batch():
+    """Test batched classical detection ranks spoofed rows higher."""
+    det = Detector()
+    det.set_reference(np.random.normal(0, 50e-12, 1000))
+
+    batch = np.stack([
+        np.random.normal(0, 50e-12, 1000),
+        np.random.normal(1e-9, 50e-12, 1000)
+    ])
+    scores = det.classical_detect(batch)
+
+    assert scores.shape == (2,)
+    assert scores[0] < scores[1]
+
+
+def test_classical_detect_time_push_outside_window():
+    """Test a 10 ns push is caught rather than dropped from the histogram."""
+    det = Detector()
+    dt = np.random.normal(100e-12, 50e-12, 2000)
+    det.set_reference(dt)
+
+    pushed = dt.copy()
+    pushed[::2] += 10e-9
+
+    scores = det.classical_detect(np.stack([dt, pushed]))
+    assert scores[0] < 0.5
+    assert scores[1] > 0.5
 
 
 def test_build_vae():
@@ -41,4 +74,146 @@ def test_compute_roc():
 
     roc_metrics = det.compute_roc(true_labels, scores)
     assert 'auc' in roc_metrics
-    assert 0 <= roc_metrics['auc'] <= 1
\ No newline at end of file
+    assert 0 <= roc_metrics['auc'] <= 1
+
+
+def test_ml_detect_batch():
+    """Test batched VAE scoring returns one score per histogram."""
+    det = Detector(batch_size=4)
+    det.vae = lambda x, training=False: x * 0.5  # Stand-in model
+
+    hists = np.random.random((10, 100))
+    scores = det.ml_detect(hists)
+
+    assert scores.shape == (10,)
+    assert np.allclose(scores, np.mean((0.5 * hists)**2, axis=1), rtol=1e-5)
+
+
+def test_hellinger_from_dt_matches_numpy():
+    """Test fused Hellinger kernel against the histogram-based computation."""
+    from quantum_gnss_guard.utils import hellinger_from_dt, hellinger_distance
+
+    lo = np.array([-1e-9, -2e-9, -1e-9, -5e-10])
+    hi = np.array([1e-9, 2e-9, 1.5e-9, 5e-10])
+    n_bins = np.array([50, 40, 25, 10])
+    refs = np.zeros((4, n_bins.max()))
+    for r in range(4):
+        ref, _ = np.histogram(np.random.normal(0, 2e-10, 500), bins=n_bins[r], range=(lo[r], hi[r]))
+        refs[r, :n_bins[r]] = ref / ref.sum()
+    batch = np.random.normal(1e-10, 3e-10, (4, 300))
+    batch[2, 250:] = np.nan  # Padding is ignored
+
+    d_h = hellinger_from_dt(batch, refs, lo, hi, n_bins)
+
+    for r, (row, d) in enumerate(zip(batch, d_h)):
+        # Out-of-range samples count in the edge bins
+        row = np.clip(row[~np.isnan(row)], lo[r], hi[r])
+        hist, _ = np.histogram(row, bins=n_bins[r], range=(lo[r], hi[r]))
+        assert d == pytest.approx(hellinger_distance(hist / hist.sum(), refs[r, :n_bins[r]]))
+
+    empty = np.full((1, 5), np.nan)
+    assert hellinger_from_dt(empty, refs[:1], lo[:1], hi[:1], n_bins[:1])[0] == 1.0
+
+
+def test_hellinger_distance():
+    """Test Hellinger distance against the closed form and its bounds."""
+    from quantum_gnss_guard.utils import hellinger_distance
+
+    p = np.random.dirichlet(np.ones(30))
+    q = np.random.dirichlet(np.ones(30))
+    expected = np.sqrt(np.sum((np.sqrt(p) - np.sqrt(q))**2)) / np.sqrt(2)
+
+    assert hellinger_distance(p, q) == pytest.approx(expected)
+    assert hellinger_distance(p, p) == 0.0
+    assert hellinger_distance([1, 0], [0, 1]) == pytest.approx(1.0)
+
+
+def test_train_vae_and_detect():
+    """Test VAE training and ML scoring end to end."""
+    det = Detector(coincidence_bins=20)
+    hists = np.random.random((32, 20)).astype(np.float32)
+
+    det.train_vae(hists, epochs=1)
+    scores = det.ml_detect(hists[:5])
+
+    assert scores.shape == (5,)
+    assert np.all(np.isfinite(scores))
+
+
+def test_classical_detect_reuses_reference_histogram():
+    """Test rows on the same grid range reuse the cached reference histogram."""
+    det = Detector()
+    det.set_reference(np.random.normal(0, 50e-12, 1000))
+    lo, hi = det._legit_range
+    batch = np.random.uniform(lo, hi, (2, 500))
+
+    first = det.classical_detect(batch)
+    assert len(det._ref_hists) == 1
+    (k_lo, k_hi), hist = next(iter(det._ref_hists.items()))
+    second = det.classical_detect(batch[::-1])
+
+    assert det._ref_hists[(k_lo, k_hi)] is hist
+    lo_e, hi_e = det._grid_range(k_lo, k_hi)
+    assert lo_e <= lo and hi_e > hi
+    assert np.allclose(first, second[::-1])
+
+
+def test_reference_histogram_cache_bounded():
+    """Test the reference histogram cache keeps at most 16 ranges, dropping the oldest."""
+    from quantum_gnss_guard.detector import _REF_CACHE_SIZE
+
+    det = Detector()
+    det.set_reference(np.random.normal(0, 50e-12, 1000))
+    # Shifted rows each need a different bin span
+    batch = np.random.normal(0, 50e-12, (40, 200)) + np.arange(40)[:, None] * 0.1e-9
+
+    det.classical_detect(batch)
+    assert len(det._ref_hists) == _REF_CACHE_SIZE
+    newest = next(reversed(det._ref_hists))
+
+    det.classical_detect(batch[-1:])
+    assert next(reversed(det._ref_hists)) == newest
+    assert len(det._ref_hists) == _REF_CACHE_SIZE
+
+
+def test_classical_detect_legit_not_flagged():
+    """Test legitimate data scored against an independent reference stays below threshold."""
+    det = Detector()
+    det.set_reference(np.random.normal(0, 50e-12, 1000))
+
+    scores = det.classical_detect(np.random.normal(0, 50e-12, (20, 1000)))
+    assert np.all(scores < 0.5)
+
+
+def test_detect_batch_rows_independent():
+    """Test a row's score does not depend on the other rows or their lengths."""
+    det = Detector()
+    det.set_reference(np.random.normal(0, 50e-12, 1000))
+    legit = np.random.normal(0, 50e-12, 800)
+    pushed = np.random.normal(0, 50e-12, 1200) + 10e-9
+
+    alone = det.detect(legit, use_ml=False)['classical_score']
+    batched = det.detect_batch([legit, pushed], use_ml=False)
+
+    assert batched[0]['classical_score'] == pytest.approx(alone)
+    assert batched[0]['decision'] == False
+    assert batched[1]['decision'] == True
+
+
+def test_classical_detect_bounded_window():
+    """Test outliers and large pushes stay within the window's bins, and empty rows score."""
+    det = Detector()
+    dt = np.random.normal(100e-12, 50e-12, 1000)
+    det.set_reference(dt)
+
+    outlier = dt.copy()
+    outlier[0] = 1.0
+    pushed = dt + 1e-3  # 1 ms push
+
+    scores = det.classical_detect(np.stack([outlier, pushed]))
+    assert scores[0] < 0.5
+    assert scores[1] > 0.5
+    assert all(len(hist) <= det.bins for hist in det._ref_hists.values())
+
+    empty = det.detect(np.array([]), use_ml=False)
+    assert empty['classical_score'] == pytest.approx(expit(10 * (1 - det.threshold)))
@@ -35,4 +35,54 @@ def test_link_budget():
 
     rx_power = link_budget(10, 500, 375)  # 500 km, 375 GHz
     assert rx_power < 10  # Should be attenuated
-    assert rx_power > -100  # Not completely lost
\ No newline at end of file
+    assert rx_power > -100  # Not completely lost
+
+
+def test_max_elevations_batched(sample_tle, tmp_path):
+    """Test batched max elevation matches per-pass propagation."""
+    import numpy as np
+
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+
+    orb = Orbital(str(tle_file), 40, -74, 0)
+    satellite = orb.satellites[0]
+    times, events = satellite.find_events(orb.station, orb.ts.utc(2023, 6, 14),
+                                          orb.ts.utc(2023, 6, 15), altitude_degrees=10)
+    rise_times, set_times = times[events == 0], times[events == 2]
+    n = min(len(rise_times), len(set_times))
+
+    max_elev = orb._max_elevations(satellite, rise_times[:n], set_times[:n])
+
+    expected = [np.max((satellite - orb.station).at(orb.ts.linspace(t0, t1, 100)).altaz()[0].degrees)
+                for t0, t1 in zip(rise_times[:n], set_times[:n])]
+    assert len(max_elev) == n
+    assert np.allclose(max_elev, expected)
+
+
+def test_link_budget_over_pass(sample_tle, tmp_path):
+    """Test link budget time series over a pass."""
+    from quantum_gnss_guard.utils import link_budget
+
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+
+    orb = Orbital(str(tle_file), 40, -74, 0)
+    budget = orb.link_budget_over_pass(orb.satellites[0], datetime(2023, 6, 14, 0, 0),
+                                       datetime(2023, 6, 14, 0, 10))
+
+    assert len(budget) == 100
+    assert list(budget.columns) == ['time', 'elevation', 'distance_km', 'rx_power_dbm']
+    assert budget['rx_power_dbm'].iloc[0] == link_budget(10, budget['distance_km'].iloc[0], 375)
+
+
+def test_orbital_pickle(sample_tle, tmp_path):
+    """Test Orbital survives pickling for parallel workers."""
+    import pickle
+
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+
+    orb = pickle.loads(pickle.dumps(Orbital(str(tle_file), 40, -74, 0)))
+    assert len(orb.satellites) == 1
+    assert orb.satellites[0].name == 'ISS (ZARYA)'
@@ -1,6 +1,7 @@
 """Tests for QTT module."""
 
 import numpy as np
+import pytest
 import pandas as pd
 from quantum_gnss_guard.qtt import QuantumTimeTransfer
 
@@ -28,6 +29,41 @@ def test_generate_sync_pulses():
     assert 'time_offset' in sync_events.columns
 
 
+def test_sync_pulses_nearest_gnss_ref():
+    """Test each pulse is paired with its nearest GNSS timestamp."""
+    qtt = QuantumTimeTransfer()
+
+    gnss_times = np.random.permutation(np.random.uniform(0, 2.0, 50))
+    sync_events = qtt.generate_sync_pulses(2.0, gnss_times)
+
+    pulse_times = sync_events['pulse_time'].values
+    expected = gnss_times[np.argmin(np.abs(gnss_times[None, :] - pulse_times[:, None]), axis=1)]
+    assert np.array_equal(sync_events['gnss_ref'].values, expected)
+    assert np.all(sync_events['quantum_phase'].between(0, 2 * np.pi))
+
+
+def test_sync_pulses_reproducible():
+    """Test sync pulse generation is reproducible for a fixed seed."""
+    gnss_times = np.linspace(0, 1.0, 100)
+
+    first = QuantumTimeTransfer(sync_rate=10000, seed=3).generate_sync_pulses(1.0, gnss_times)
+    second = QuantumTimeTransfer(sync_rate=10000, seed=3).generate_sync_pulses(1.0, gnss_times)
+
+    pd.testing.assert_frame_equal(first, second)
+    # Time offsets stay within one optical period plus noise
+    assert np.all(np.abs(first['time_offset']) < 2e-12)
+
+
+def test_nearest_sorted():
+    """Test searchsorted nearest-neighbour lookup, including ends and ties."""
+    from quantum_gnss_guard.utils import nearest_sorted
+
+    ref = np.array([0.0, 1.0, 2.0, 4.0])
+    queries = np.array([-1.0, 0.4, 0.5, 2.9, 3.1, 9.0])
+
+    assert np.array_equal(nearest_sorted(ref, queries), [0, 0, 0, 2, 3, 3])
+
+
 def test_detect_sync_anomalies():
     """Test sync anomaly detection."""
     qtt = QuantumTimeTransfer()
@@ -79,4 +115,29 @@ def test_clock_drift_estimation():
     
     # Should detect the injected drift
     mean_drift = np.mean(drift_estimates)
-    assert abs(mean_drift - drift_rate) < 0.5e-12
\ No newline at end of file
+    assert abs(mean_drift - drift_rate) < 0.5e-12
+
+
+def test_clock_drift_matches_polyfit():
+    """Test sliding-window drift agrees with per-window polyfit."""
+    qtt = QuantumTimeTransfer()
+
+    times = np.sort(np.random.uniform(0, 5, 300))
+    errors = 2e-12 * times + np.random.normal(0, 0.1e-12, 300)
+    sync_events = pd.DataFrame({'pulse_time': times, 'sync_error': errors})
+
+    drift_estimates = qtt.estimate_clock_drift(sync_events, window_size=50)
+
+    expected = [np.polyfit(times[i:i+50], errors[i:i+50], 1)[0] for i in range(250)]
+    assert len(drift_estimates) == 250
+    assert np.allclose(drift_estimates, expected, rtol=1e-6, atol=1e-20)
+
+
+def test_bell_state_lazy():
+    """Test Bell state is built on first access."""
+    qtt = QuantumTimeTransfer()
+    assert 'bell_state' not in qtt.__dict__
+
+    bell = qtt.bell_state
+    assert bell.norm() == pytest.approx(1.0)
+    assert qtt.bell_state is bell
@@ -1,6 +1,7 @@
 """Tests for quantum channel module."""
 
 import numpy as np
+import pytest
 import pandas as pd
 from quantum_gnss_guard.quantum_channel import QuantumChannel
 
@@ -22,6 +23,9 @@ def test_generate_pairs():
     assert 'detector' in events.columns
     # Should have some events
     assert len(events) > 0
+    assert events['time'].is_monotonic_increasing
+    assert set(events.loc[events['photon_id'] == 'A', 'detector']) <= {1}
+    assert set(events.loc[events['photon_id'] == 'B', 'detector']) <= {2}
 
 
 def test_compute_coincidences():
@@ -43,4 +47,116 @@ def test_fidelity():
     """Test fidelity check."""
     qc = QuantumChannel()
     fid = qc.fidelity_check()
-    assert 0.9 <= fid <= 1.0
\ No newline at end of file
+    assert 0.9 <= fid <= 1.0
+
+
+def test_bell_state_lazy_and_shared():
+    """Test the Bell state is built on first use and shared with QTT."""
+    import subprocess
+    import sys
+    from quantum_gnss_guard.qtt import QuantumTimeTransfer
+
+    code = "import sys, quantum_gnss_guard.simulator; print('qutip' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
+
+    qc = QuantumChannel()
+    assert 'bell_state' not in qc.__dict__
+    assert qc.bell_state is QuantumChannel().bell_state
+    assert qc.bell_state is QuantumTimeTransfer().bell_state
+    assert qc.bell_state.norm() == pytest.approx(1.0)
+
+
+def test_compute_coincidences_matches_pairwise():
+    """Test coincidences against a brute-force pairwise scan."""
+    qc = QuantumChannel()
+    times = np.sort(np.random.uniform(0, 1e-7, 400))
+    detectors = np.random.randint(1, 3, 400)
+    events = pd.DataFrame({'time': times, 'detector': detectors})
+
+    dt = qc.compute_coincidences(events, window_ps=500)
+
+    expected = [times[j] - times[i]
+                for i in range(len(times)) for j in range(i + 1, len(times))
+                if times[j] - times[i] <= 500e-12 and detectors[i] != detectors[j]]
+    assert len(dt) == len(expected)
+    assert np.allclose(dt, expected, rtol=0, atol=1e-18)
+
+
+def test_generate_pairs_raw_matches_dataframe():
+    """Test the raw arrays path gives the same coincidences as the DataFrame path."""
+    qc = QuantumChannel(pair_rate=2000, seed=5)
+    events = qc.generate_pairs(duration=1.0)
+    times, detectors = QuantumChannel(pair_rate=2000, seed=5).generate_pairs_raw(duration=1.0)
+
+    assert np.all(np.diff(times) >= 0)
+    assert np.array_equal(times, events['time'].values)
+    assert np.array_equal(qc.compute_coincidences((times, detectors)),
+                          qc.compute_coincidences(events))
+
+
+def test_compute_coincidences_float32_matches_float64():
+    """Test float32 Δt output against the float64 path."""
+    qc = QuantumChannel(pair_rate=5000)
+    events = qc.generate_pairs_raw(duration=600.0, base_loss_db=10)
+
+    dt64 = qc.compute_coincidences(events)
+    dt32 = qc.compute_coincidences(events, dtype=np.float32)
+
+    assert dt32.dtype == np.float32
+    assert len(dt32) == len(dt64) > 0
+    assert np.allclose(dt32, dt64, rtol=1e-6, atol=0)
+
+
+def test_generate_pairs_batch():
+    """Test batched runs are sorted, independent and at the expected rate."""
+    qc = QuantumChannel(pair_rate=20000, dark_count_hz=100)
+    batch = qc.generate_pairs_batch(duration=1.0, n_runs=4, base_loss_db=5)
+
+    assert len(batch) == 4
+    for times, detectors in batch:
+        assert np.all(np.diff(times) >= 0)
+        assert set(np.unique(detectors)) <= {1, 2}
+        assert times.min() > -1e-9 and times.max() < 1.0 + 1e-9
+        assert len(qc.compute_coincidences((times, detectors))) > 0
+    assert not np.array_equal(batch[0][0][:10], batch[1][0][:10])
+
+    # Same expected event count as the single-run path
+    single = np.mean([len(qc.generate_pairs_raw(1.0, base_loss_db=5)[0]) for _ in range(4)])
+    batched = np.mean([len(times) for times, _ in batch])
+    assert abs(batched - single) < 0.1 * single
+
+
+def test_seeded_channel_reproducible():
+    """Test the channel's own generator makes runs reproducible and independent of np.random."""
+    np.random.seed(0)
+    first = QuantumChannel(pair_rate=2000, seed=11).generate_pairs_raw(duration=1.0)
+    np.random.seed(1)
+    second = QuantumChannel(pair_rate=2000, seed=11).generate_pairs_raw(duration=1.0)
+
+    assert np.array_equal(first[0], second[0])
+    assert np.array_equal(first[1], second[1])
+
+
+def test_poisson_arrivals():
+    """Test Poisson arrivals are sorted, in range and at the expected rate."""
+    from quantum_gnss_guard.utils import poisson_arrivals
+
+    arrivals = poisson_arrivals(1000, 10.0)
+
+    assert np.all(np.diff(arrivals) >= 0)
+    assert arrivals[0] >= 0 and arrivals[-1] < 10.0
+    assert abs(len(arrivals) - 10000) < 500  # 5 sigma
+    assert len(poisson_arrivals(0, 10.0)) == 0
+
+
+def test_rayleigh_fade_vectorized():
+    """Test rayleigh_fade draws one fade per requested sample."""
+    from quantum_gnss_guard.utils import rayleigh_fade
+
+    assert np.isscalar(rayleigh_fade(20.0))
+    faded = rayleigh_fade(20.0, size=1000)
+    assert faded.shape == (1000,)
+    assert rayleigh_fade(np.full(7, 20.0)).shape == (7,)
+    # Median of Rayleigh(1) is sqrt(2 ln 2), so the median fade is about +1.6 dB
+    assert abs(np.median(faded) - 20 - 20 * np.log10(np.sqrt(2 * np.log(2)))) < 0.5
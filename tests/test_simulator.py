@@ -0,0 +1,133 @@
+"""Tests for simulator module."""
+
+import numpy as np
+import pandas as pd
+from quantum_gnss_guard.simulator import Pass, Simulator
+
+
+def _config(tle_file, **overrides):
+    """Small simulator configuration over a tmp TLE file."""
+    config = {
+        'tle_file': str(tle_file),
+        'station_loc': [40.0, -74.0, 0.0],
+        'pair_rate': 1000,
+        'attacks': [{'attack_type': 'time-push'}, {'attack_type': 'none'}],
+        'seed': 7
+    }
+    config.update(overrides)
+    return config
+
+
+def test_detection_fallback_reported_once(sample_tle, tmp_path, capsys):
+    """Test failed detections are flagged per result and summarized once by run()."""
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+
+    sim = Simulator(_config(tle_file))
+
+    def failing_detect(dt, use_ml=True):
+        raise ValueError("detector unavailable")
+
+    sim.detector.detect = failing_detect
+    results = sim.run(mc_runs=2, n_jobs=1)
+
+    assert results['detection_fallback'].all()
+    assert capsys.readouterr().out.count("Detection failed in 4/4 tasks") == 1
+
+
+def test_run_parallel_matches_serial(sample_tle, tmp_path):
+    """Test run() gives the same frame for the same seed, serial or parallel."""
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+    config = _config(tle_file, enable_qtt=True)
+
+    serial = Simulator(config).run(mc_runs=2, n_jobs=1)
+    parallel = Simulator(config).run(mc_runs=2, n_jobs=2)
+
+    # pass_id embeds the synthetic pass start time, which is taken from the clock
+    pd.testing.assert_frame_equal(serial.drop(columns='pass_id'),
+                                  parallel.drop(columns='pass_id'))
+    assert len(serial) == 4
+
+
+def test_run_leaves_global_rng_untouched(sample_tle, tmp_path):
+    """Test an in-process run does not reseed the caller's np.random state."""
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+    sim = Simulator(_config(tle_file))
+
+    np.random.seed(123)
+    expected = np.random.random(5)
+    np.random.seed(123)
+    sim.run(mc_runs=1, n_jobs=1)
+
+    assert np.array_equal(np.random.random(5), expected)
+
+
+def test_run_leaves_component_rngs_untouched(sample_tle, tmp_path):
+    """Test tasks draw from their own generators, not the shared channel/QTT ones."""
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+    sim = Simulator(_config(tle_file, enable_qtt=True))
+    quantum_state = sim.quantum.rng.bit_generator.state
+    qtt_state = sim.qtt.rng.bit_generator.state
+
+    sim.run(mc_runs=1, n_jobs=1)
+
+    assert sim.quantum.rng.bit_generator.state == quantum_state
+    assert sim.qtt.rng.bit_generator.state == qtt_state
+
+
+def test_run_dispatches_without_orbital(sample_tle, tmp_path, monkeypatch):
+    """Test tasks are dispatched on a runner that leaves out the orbital model."""
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+    sim = Simulator(_config(tle_file))
+    runners = []
+    original = Simulator._run_task
+
+    def recording_run_task(self, *args):
+        runners.append(self)
+        return original(self, *args)
+
+    monkeypatch.setattr(Simulator, '_run_task', recording_run_task)
+    sim.run(mc_runs=1, n_jobs=1)
+
+    assert runners and all(runner.orbital is None for runner in runners)
+    assert sim.orbital is not None
+
+
+def test_run_sets_reference_once(sample_tle, tmp_path, monkeypatch):
+    """Test run() draws one independent reference shared by all its tasks."""
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+    sim = Simulator(_config(tle_file))
+    references = []
+    original = sim.detector.set_reference
+
+    def recording_set_reference(dt_true):
+        references.append(dt_true)
+        original(dt_true)
+
+    monkeypatch.setattr(sim.detector, 'set_reference', recording_set_reference)
+    results = sim.run(mc_runs=3, n_jobs=1)
+
+    assert len(references) == 1
+    # 'none' tasks are not compared against their own coincidences
+    none_scores = results.loc[results['attack_type'] == 'none', 'detection_score']
+    assert none_scores.nunique() == len(none_scores)
+
+
+def test_run_single_pass_builds_missing_reference(sample_tle, tmp_path):
+    """Test a standalone pass draws a reference once and keeps it for later passes."""
+    tle_file = tmp_path / "tle.txt"
+    tle_file.write_text(sample_tle)
+    sim = Simulator(_config(tle_file))
+    pass_info = Pass('TEST-SAT', '2024-01-01 00:00:00', 1.0)
+
+    sim.run_single_pass(pass_info, {'attack_type': 'none'}, seed=1)
+    reference = sim.detector._legit_dt
+    result = sim.run_single_pass(pass_info, {'attack_type': 'none'}, seed=2)
+
+    assert sim.detector._legit_dt is reference
+    assert not result['detection_fallback']
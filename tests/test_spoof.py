@@ -51,4 +51,48 @@ def test_nmea_spoof():
 
     assert len(spoofed) == 1
     # Time should be modified
-    assert spoofed[0] != original[0]
\ No newline at end of file
+    assert spoofed[0] != original[0]
+
+
+def test_apply_spoof_reproducible():
+    """Test spoofing is reproducible for a fixed config seed."""
+    config = {'attack_type': 'hybrid', 'spoof_rate': 0.5, 'seed': 0}
+    gnss_times = np.linspace(0, 10, 20000)
+    quantum_dt = np.zeros(20000)
+
+    first = GNSSSpoof(config).apply_spoof(gnss_times, quantum_dt)
+    second = GNSSSpoof(config).apply_spoof(gnss_times, quantum_dt)
+
+    assert np.array_equal(first[0], second[0])
+    assert np.array_equal(first[1], second[1])
+    # Roughly half the samples are spoofed
+    assert 0.4 < np.mean(first[1] != 0) < 0.6
+
+
+def test_apply_spoof_unknown_attack_passthrough():
+    """Test unknown attack types leave signals untouched."""
+    spoof = GNSSSpoof({'attack_type': 'none', 'spoof_rate': 1.0})
+
+    gnss_times = np.array([0.0, 1.0, 2.0])
+    quantum_dt = np.array([1e-12, 2e-12, 3e-12])
+
+    spoofed_gnss, spoofed_dt = spoof.apply_spoof(gnss_times, quantum_dt)
+
+    assert np.array_equal(spoofed_gnss, gnss_times)
+    assert np.array_equal(spoofed_dt, quantum_dt)
+
+
+def test_nmea_spoof_shift_and_passthrough():
+    """Test GPGGA time shift, midnight rollover and non-GGA passthrough."""
+    spoof = GNSSSpoof({'attack_type': 'time-push', 'delta_ns': 5e9})  # 5 s
+
+    original = [
+        '$GPGGA,123456,40.0,N,74.0,W,1,1,1,0,M,0,M,,*00',
+        '$GPGGA,235958,40.0,N,74.0,W,1,1,1,0,M,0,M,,*00',
+        '$GPRMC,123456,A,40.0,N,74.0,W,0,0,010123,,*00'
+    ]
+    spoofed = spoof.generate_nmea_spoofed(original)
+
+    assert spoofed[0] == '$GPGGA,123501,40.0,N,74.0,W,1,1,1,0,M,0,M,,*00'
+    assert spoofed[1] == '$GPGGA,000003,40.0,N,74.0,W,1,1,1,0,M,0,M,,*00'
+    assert spoofed[2] == original[2]